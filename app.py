@@ -1,10 +1,12 @@
 from flask import Flask, render_template, request, send_file, jsonify, flash, redirect, url_for
 import os
 import uuid
-from datetime import datetime
 from geocoder import load_zipcode_lookup, geocode_single_address_api, process_address_file, setup_logging
 from reverse_geocoding import setup_reverse_geocoding, reverse_geocode_single, process_reverse_geocoding_file
 from elevation_finder import get_elevation_for_coords, process_elevation_file
+from file_catalog import FileCatalog
+from coordinate_parser import parse_coordinate_string
+from result_compression import compress_file, compressed_path, available_encodings, ENCODING_EXTENSIONS
 from config import *
 
 def create_app():
@@ -30,10 +32,42 @@ def create_app():
         logger.error(f"Failed to initialize reverse geocoder: {e}")
         reverse_geocoder = None
 
+    # Initialize file catalog
+    try:
+        file_catalog = FileCatalog(CATALOG_DB_PATH, logger)
+        file_catalog.sync_folder('uploads', UPLOAD_FOLDER)
+        file_catalog.sync_folder('outputs', OUTPUT_FOLDER, extensions=('.csv',))
+        file_catalog.evict('uploads', FILE_MAX_AGE_DAYS, UPLOAD_FOLDER_MAX_BYTES)
+        file_catalog.evict('outputs', FILE_MAX_AGE_DAYS, OUTPUT_FOLDER_MAX_BYTES)
+    except Exception as e:
+        logger.error(f"Failed to initialize file catalog: {e}")
+        file_catalog = None
+
     # Store in app context
     app.logger_instance = logger
     app.zip_dict = zip_dict
     app.reverse_geocoder = reverse_geocoder
+    app.file_catalog = file_catalog
+
+    def catalog_file(folder, path, file_id, job_type, original_filename):
+        """Record a written file in the catalog and apply the retention limits"""
+        if app.file_catalog is None or not os.path.exists(path):
+            return
+        try:
+            app.file_catalog.add_file(folder, path, file_id, job_type, original_filename)
+            app.file_catalog.evict('uploads', FILE_MAX_AGE_DAYS, UPLOAD_FOLDER_MAX_BYTES)
+            app.file_catalog.evict('outputs', FILE_MAX_AGE_DAYS, OUTPUT_FOLDER_MAX_BYTES)
+        except Exception as e:
+            app.logger_instance.error(f"Error updating file catalog for {path}: {e}")
+
+    def compress_output(path):
+        """Store a compressed copy of a finished result for faster downloads"""
+        if not DOWNLOAD_COMPRESSION or not os.path.exists(path):
+            return
+        try:
+            compress_file(path, DOWNLOAD_COMPRESSION)
+        except Exception as e:
+            app.logger_instance.error(f"Error compressing {path}: {e}")
 
     @app.route('/')
     def index():
@@ -77,9 +111,12 @@ def create_app():
                 # Save uploaded file
                 file.save(input_path)
                 app.logger_instance.info(f"Saved uploaded file: {input_path}")
+                catalog_file('uploads', input_path, file_id, 'geocode', original_filename)
                 
                 # Process the file
                 process_address_file(input_path, output_path, app.zip_dict, app.logger_instance)
+                compress_output(output_path)
+                catalog_file('outputs', output_path, file_id, 'geocode', original_filename)
                 
                 return jsonify({
                     'success': True,
@@ -102,12 +139,12 @@ def create_app():
                 return jsonify({'error': 'Coordinates are required'}), 400
             
             try:
-                lat_str, lon_str = coords.split(',')
+                latitude, longitude = parse_coordinate_string(coords)
                 coords_dict = {
-                    'lat': float(lat_str.strip()),
-                    'lon': float(lon_str.strip())
+                    'lat': latitude,
+                    'lon': longitude
                 }
-            except (ValueError, IndexError):
+            except ValueError:
                 return jsonify({'error': 'Invalid coordinate format. Use: latitude,longitude'}), 400
             
             if app.reverse_geocoder is None:
@@ -144,12 +181,15 @@ def create_app():
                 # Save uploaded file
                 file.save(input_path)
                 app.logger_instance.info(f"Saved uploaded file for reverse geocoding: {input_path}")
+                catalog_file('uploads', input_path, file_id, 'reverse_geocode', original_filename)
                 
                 if app.reverse_geocoder is None:
                     return jsonify({'error': 'Reverse geocoding service not available'}), 500
                 
                 # Process the file
                 process_reverse_geocoding_file(input_path, output_path, app.reverse_geocoder, app.logger_instance)
+                compress_output(output_path)
+                catalog_file('outputs', output_path, file_id, 'reverse_geocode', original_filename)
                 
                 return jsonify({
                     'success': True,
@@ -172,10 +212,8 @@ def create_app():
                 return jsonify({'error': 'Coordinates are required'}), 400
             
             try:
-                lat_str, lon_str = coords.split(',')
-                latitude = float(lat_str.strip())
-                longitude = float(lon_str.strip())
-            except (ValueError, IndexError):
+                latitude, longitude = parse_coordinate_string(coords)
+            except ValueError:
                 return jsonify({'error': 'Invalid coordinate format. Use: latitude,longitude'}), 400
             
             elevation = get_elevation_for_coords(latitude, longitude, app.logger_instance)
@@ -218,9 +256,12 @@ def create_app():
                 # Save uploaded file
                 file.save(input_path)
                 app.logger_instance.info(f"Saved uploaded file for elevation: {input_path}")
+                catalog_file('uploads', input_path, file_id, 'elevation', original_filename)
                 
                 # Process the file
                 process_elevation_file(input_path, output_path, app.logger_instance)
+                compress_output(output_path)
+                catalog_file('outputs', output_path, file_id, 'elevation', original_filename)
                 
                 return jsonify({
                     'success': True,
@@ -239,10 +280,27 @@ def create_app():
     def download_file(filename):
         try:
             file_path = os.path.join(OUTPUT_FOLDER, filename)
-            if os.path.exists(file_path):
-                return send_file(file_path, as_attachment=True)
-            else:
+            # Compressed copies are only served through Content-Encoding on the result name
+            if filename.endswith(tuple(ENCODING_EXTENSIONS.values())) or not os.path.exists(file_path):
                 return jsonify({'error': 'File not found'}), 404
+            
+            # Serve the precompressed copy when the client accepts its encoding.
+            # send_file handles Range and conditional requests for either representation.
+            encoding = request.accept_encodings.best_match(available_encodings(file_path))
+            if encoding:
+                response = send_file(
+                    compressed_path(file_path, encoding),
+                    mimetype='text/csv',
+                    as_attachment=True,
+                    download_name=filename,
+                    conditional=True
+                )
+                response.headers['Content-Encoding'] = encoding
+            else:
+                response = send_file(file_path, as_attachment=True, conditional=True)
+            response.headers['Accept-Ranges'] = 'bytes'
+            response.vary.add('Accept-Encoding')
+            return response
         except Exception as e:
             app.logger_instance.error(f"Error downloading file: {e}")
             return jsonify({'error': str(e)}), 500
@@ -250,16 +308,29 @@ def create_app():
     @app.route('/list-files')
     def list_files():
         try:
-            files = []
-            for filename in os.listdir(OUTPUT_FOLDER):
-                if filename.endswith('.csv'):
-                    file_path = os.path.join(OUTPUT_FOLDER, filename)
-                    files.append({
-                        'filename': filename,
-                        'size': os.path.getsize(file_path),
-                        'modified': datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-                    })
-            return jsonify({'files': files})
+            if app.file_catalog is None:
+                return jsonify({'error': 'File catalog not available'}), 500
+            
+            try:
+                page = max(int(request.args.get('page', 1)), 1)
+                per_page = int(request.args.get('per_page', LIST_FILES_PAGE_SIZE))
+                per_page = min(max(per_page, 1), LIST_FILES_MAX_PAGE_SIZE)
+            except ValueError:
+                return jsonify({'error': 'page and per_page must be integers'}), 400
+            
+            files, total = app.file_catalog.list_files(
+                'outputs',
+                job_type=request.args.get('job_type') or None,
+                search=request.args.get('q', '').strip() or None,
+                page=page,
+                per_page=per_page
+            )
+            return jsonify({
+                'files': files,
+                'page': page,
+                'per_page': per_page,
+                'total': total
+            })
         except Exception as e:
             app.logger_instance.error(f"Error listing files: {e}")
             return jsonify({'error': str(e)}), 500
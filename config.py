@@ -29,4 +29,24 @@ REVERSE_GEOCODING_DELAY = 1
 # Geocoding settings for global version
 MAX_RETRIES = 1
 NOMINATIM_DELAY = 5.0
-PHOTON_DELAY = 2.0
\ No newline at end of file
+PHOTON_DELAY = 2.0
+
+# Spatial ordering for bulk elevation
+SPATIAL_ORDERING = True
+SPATIAL_CURVE = 'morton'  # 'morton' or 'hilbert'
+SPATIAL_GRID_ROWS = 21600
+SPATIAL_GRID_COLS = 43200
+ELEVATION_CHUNK_SIZE = 5000
+ELEVATION_WORKERS = 1
+ELEVATION_MAX_WINDOW_CELLS = 4_000_000
+
+# File catalog and retention settings
+CATALOG_DB_PATH = 'file_catalog.db'
+LIST_FILES_PAGE_SIZE = 50
+LIST_FILES_MAX_PAGE_SIZE = 500
+FILE_MAX_AGE_DAYS = 30
+UPLOAD_FOLDER_MAX_BYTES = 1 * 1024 ** 3
+OUTPUT_FOLDER_MAX_BYTES = 5 * 1024 ** 3
+
+# Result download settings
+DOWNLOAD_COMPRESSION = 'gzip'  # 'gzip', 'zstd' or None
\ No newline at end of file
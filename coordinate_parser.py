@@ -0,0 +1,122 @@
+import re
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+ParsedCoordinates = namedtuple(
+    'ParsedCoordinates', ['input_coordinates', 'latitudes', 'longitudes', 'valid']
+)
+
+# One latitude or longitude in decimal or degree/minute/second notation, e.g.
+# -73.98, 40.446N, N40 26.767, 40°26'46"N, 40:26:46 S
+COMPONENT_PATTERN = re.compile(
+    r"^\s*(?P<prefix>[NSEW])?\s*(?P<sign>[-+])?\s*"
+    r"(?P<deg>\d+(?:\.\d+)?)\s*[°º:]?\s*"
+    r"(?:(?P<min>\d+(?:\.\d+)?)\s*['′:]?\s*)?"
+    r"(?:(?P<sec>\d+(?:\.\d+)?)\s*(?:\"|″|'')?\s*)?"
+    r"(?P<suffix>[NSEW])?\s*$",
+    re.IGNORECASE
+)
+
+LATITUDE_NAMES = {'lat', 'latitude', 'y'}
+LONGITUDE_NAMES = {'lon', 'lng', 'long', 'longitude', 'x'}
+COORDINATE_NAMES = {'coordinates', 'coordinate', 'coords', 'lat,lon', 'lat,lng', 'latitude,longitude', 'latlon', 'latlng'}
+HEADER_NAMES = LATITUDE_NAMES | LONGITUDE_NAMES | COORDINATE_NAMES
+
+def _as_strings(values):
+    # Missing cells become empty strings (pandas 3 keeps NaN through astype(str))
+    return pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+
+def parse_component(values, axis):
+    """Parse a column of latitudes ('lat') or longitudes ('lon') into floats, NaN where invalid"""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        result = values.to_numpy(dtype=float, na_value=np.nan)
+        return np.where(np.isfinite(result), result, np.nan)
+
+    strings = _as_strings(values)
+    result = pd.to_numeric(strings, errors='coerce').to_numpy(dtype=float, copy=True)
+
+    # Only values that are not plain decimals go through the DMS pattern
+    pending = np.flatnonzero(np.isnan(result))
+    if len(pending):
+        parts = strings.iloc[pending].str.extract(COMPONENT_PATTERN)
+        degrees = pd.to_numeric(parts['deg'], errors='coerce')
+        minutes = pd.to_numeric(parts['min'], errors='coerce').fillna(0)
+        seconds = pd.to_numeric(parts['sec'], errors='coerce').fillna(0)
+        value = degrees + minutes / 60 + seconds / 3600
+
+        prefix = parts['prefix'].str.upper()
+        suffix = parts['suffix'].str.upper()
+        hemisphere = prefix.fillna(suffix)
+        allowed = ['N', 'S'] if axis == 'lat' else ['E', 'W']
+
+        negative = (parts['sign'] == '-') | hemisphere.isin(['S', 'W'])
+        invalid = (
+            (prefix.notna() & suffix.notna())
+            | (parts['sign'].notna() & hemisphere.notna())
+            | (hemisphere.notna() & ~hemisphere.isin(allowed))
+            | (minutes >= 60) | (seconds >= 60)
+            # Only the last part given may be fractional, e.g. "40.5 30" is rejected
+            | (parts['deg'].str.contains('.', regex=False) & (parts['min'].notna() | parts['sec'].notna()))
+            | (parts['min'].str.contains('.', regex=False) & parts['sec'].notna())
+        )
+        value = value.where(~negative, -value).where(~invalid)
+        result[pending] = value.to_numpy(dtype=float)
+
+    return np.where(np.isfinite(result), result, np.nan)
+
+def parse_coordinate_columns(lat_values, lon_values):
+    """Parse separate latitude and longitude columns"""
+    latitudes = parse_component(lat_values, 'lat')
+    longitudes = parse_component(lon_values, 'lon')
+    input_coordinates = (_as_strings(lat_values) + ',' + _as_strings(lon_values)).tolist()
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    return ParsedCoordinates(input_coordinates, latitudes, longitudes, valid)
+
+def parse_coordinate_column(values):
+    """Parse a single column of "latitude,longitude" strings"""
+    strings = _as_strings(values)
+    parts = strings.str.split(',')
+    pairs = parts.str.len() == 2
+
+    latitudes = parse_component(parts.str[0].where(pairs, ''), 'lat')
+    longitudes = parse_component(parts.str[1].where(pairs, ''), 'lon')
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    return ParsedCoordinates(strings.tolist(), latitudes, longitudes, valid)
+
+def _is_header(row):
+    return any(str(cell).strip().lower().replace(' ', '') in HEADER_NAMES for cell in row)
+
+def parse_coordinate_frame(df):
+    """Parse coordinates from an uploaded table read with header=None.
+
+    Accepts a single "lat,lon" column or separate latitude/longitude columns,
+    with or without a header row.
+    """
+    lat_col, lon_col = None, None
+    if len(df) > 1 and _is_header(df.iloc[0]):
+        names = [str(name).strip().lower() for name in df.iloc[0]]
+        lat_col = next((i for i, name in enumerate(names) if name in LATITUDE_NAMES), None)
+        lon_col = next((i for i, name in enumerate(names) if name in LONGITUDE_NAMES), None)
+        df = df.iloc[1:].reset_index(drop=True)
+
+    if lat_col is not None and lon_col is not None:
+        return parse_coordinate_columns(df.iloc[:, lat_col], df.iloc[:, lon_col])
+
+    first = df.iloc[:, 0]
+    has_pairs = _as_strings(first).str.contains(',', regex=False).mean() > 0.5 if len(df) else True
+    if df.shape[1] >= 2 and not has_pairs:
+        return parse_coordinate_columns(first, df.iloc[:, 1])
+    return parse_coordinate_column(first)
+
+def parse_coordinate_string(text):
+    """Parse one "latitude,longitude" string, raising ValueError if it is invalid"""
+    parsed = parse_coordinate_column([text])
+    if not parsed.valid[0]:
+        raise ValueError(f"Invalid coordinate format: {text}")
+    return float(parsed.latitudes[0]), float(parsed.longitudes[0])
+
+def in_bounds(latitudes, longitudes):
+    """Mask of coordinates inside the valid latitude/longitude range"""
+    return (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
@@ -2,7 +2,11 @@ import xarray as xr
 import pandas as pd
 import logging
 import os
-from config import DATA_FILE_PATH
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from config import DATA_FILE_PATH, SPATIAL_ORDERING, SPATIAL_CURVE, ELEVATION_CHUNK_SIZE, ELEVATION_WORKERS, ELEVATION_MAX_WINDOW_CELLS
+from spatial_order import spatial_order, chunk_indices
+from coordinate_parser import parse_coordinate_frame, in_bounds
 
 # Load the elevation data
 try:
@@ -38,6 +42,68 @@ def get_elevation_for_coords(latitude, longitude, logger):
         logger.error(f"Error getting elevation for {latitude},{longitude}: {str(e)}")
         return None
 
+def _nearest_indices(coords, values):
+    """Index of the nearest grid coordinate for each value (ties go to the higher index, as in .sel)"""
+    right = np.clip(np.searchsorted(coords, values), 1, len(coords) - 1)
+    left = right - 1
+    use_left = (values - coords[left]) < (coords[right] - values)
+    return np.where(use_left, left, right)
+
+def _lookup_elevation_chunk(latitudes, longitudes):
+    """Nearest-neighbour elevation lookup for a chunk of coordinates.
+
+    The netCDF backend only supports outer indexing, so pointwise .sel() would read every
+    row/column combination. Instead read the chunk's bounding box once and gather in NumPy.
+    """
+    rows = _nearest_indices(elevation_data['lat'].values, latitudes)
+    cols = _nearest_indices(elevation_data['lon'].values, longitudes)
+    return _read_cells(rows, cols)
+
+def _read_cells(rows, cols):
+    row_start, row_stop = rows.min(), rows.max() + 1
+    col_start, col_stop = cols.min(), cols.max() + 1
+
+    # Chunks that jump across the curve can span a large box; split them along the curve
+    if (row_stop - row_start) * (col_stop - col_start) > ELEVATION_MAX_WINDOW_CELLS and len(rows) > 1:
+        half = len(rows) // 2
+        return np.concatenate([_read_cells(rows[:half], cols[:half]), _read_cells(rows[half:], cols[half:])])
+
+    window = elevation_data.isel(
+        lat=slice(row_start, row_stop),
+        lon=slice(col_start, col_stop)
+    ).values
+    return np.asarray(window[rows - row_start, cols - col_start], dtype=float)
+
+def _lookup_elevations(latitudes, longitudes, indices, logger):
+    """Look up elevations for the given row indices, chunked along a space-filling curve"""
+    elevations = np.full(len(latitudes), np.nan)
+    if len(indices) == 0:
+        return elevations
+
+    if SPATIAL_ORDERING:
+        indices = indices[spatial_order(latitudes[indices], longitudes[indices], SPATIAL_CURVE)]
+    chunks = chunk_indices(indices, ELEVATION_CHUNK_SIZE)
+
+    if ELEVATION_WORKERS > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=ELEVATION_WORKERS) as executor:
+            futures = [
+                executor.submit(_lookup_elevation_chunk, latitudes[chunk], longitudes[chunk])
+                for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    elevations[chunk] = future.result()
+                except Exception as e:
+                    logger.error(f"Error getting elevation for chunk of {len(chunk)} points: {str(e)}")
+    else:
+        for chunk in chunks:
+            try:
+                elevations[chunk] = _lookup_elevation_chunk(latitudes[chunk], longitudes[chunk])
+            except Exception as e:
+                logger.error(f"Error getting elevation for chunk of {len(chunk)} points: {str(e)}")
+
+    return elevations
+
 def process_elevation_file(input_file, output_file, logger):
     """Process a file with coordinates to get elevations"""
     if elevation_data is None:
@@ -56,38 +122,31 @@ def process_elevation_file(input_file, output_file, logger):
     output_df = pd.DataFrame(columns=output_columns)
     output_df.to_csv(output_file, index=False)
     
-    results = []
-    for index, row in df.iterrows():
-        coord_str = str(row[0]).strip()
-        try:
-            lat_str, lon_str = coord_str.split(',')
-            latitude = float(lat_str.strip())
-            longitude = float(lon_str.strip())
-            
-            elevation = get_elevation_for_coords(latitude, longitude, logger)
-            
-            results.append({
-                'input_coordinates': coord_str,
-                'latitude': latitude,
-                'longitude': longitude,
-                'elevation': elevation,
-                'error': None if elevation is not None else 'Error getting elevation'
-            })
-            
-        except (ValueError, IndexError) as e:
-            logger.warning(f"Invalid coordinate format: {coord_str}")
-            results.append({
-                'input_coordinates': coord_str,
-                'latitude': None,
-                'longitude': None,
-                'elevation': None,
-                'error': f'Invalid format: {str(e)}'
-            })
+    parsed = parse_coordinate_frame(df)
+    latitudes, longitudes = parsed.latitudes, parsed.longitudes
+    errors = [None] * len(latitudes)
+    for i in np.flatnonzero(~parsed.valid):
+        logger.warning(f"Invalid coordinate format: {parsed.input_coordinates[i]}")
+        errors[i] = 'Invalid format: expected latitude,longitude'
+    
+    in_range = parsed.valid & in_bounds(latitudes, longitudes)
+    for i in np.flatnonzero(parsed.valid & ~in_range):
+        logger.warning(f"Invalid coordinates: {latitudes[i]}, {longitudes[i]}")
+    
+    elevations = _lookup_elevations(latitudes, longitudes, np.flatnonzero(in_range), logger)
+    for i in np.flatnonzero(parsed.valid & np.isnan(elevations)):
+        errors[i] = 'Error getting elevation'
     
-    # Save all results at once
-    results_df = pd.DataFrame(results)
+    # Results are indexed by original row, so output keeps the input order
+    results_df = pd.DataFrame({
+        'input_coordinates': parsed.input_coordinates,
+        'latitude': latitudes,
+        'longitude': longitudes,
+        'elevation': elevations,
+        'error': errors
+    })
     results_df = results_df[output_columns]
     results_df.to_csv(output_file, index=False)
     
-    logger.info(f"Processed {len(results)} coordinate pairs for elevation")
+    logger.info(f"Processed {len(results_df)} coordinate pairs for elevation")
     return output_file
\ No newline at end of file
@@ -0,0 +1,215 @@
+import os
+import sqlite3
+import time
+from datetime import datetime
+from result_compression import available_encodings, compressed_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    folder TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_id TEXT,
+    job_type TEXT,
+    original_filename TEXT,
+    size INTEGER NOT NULL,
+    disk_bytes INTEGER,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (folder, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_files_folder_created ON files (folder, created_at);
+CREATE INDEX IF NOT EXISTS idx_files_folder_job ON files (folder, job_type, created_at);
+"""
+
+# Result suffixes written by the bulk routes; reverse geocoding must be matched before geocoding
+OUTPUT_SUFFIXES = (
+    ('_reverse_geocoded.csv', 'reverse_geocode'),
+    ('_geocoded.csv', 'geocode'),
+    ('_elevation.csv', 'elevation'),
+)
+
+def infer_job(filename):
+    """Return (file_id, job_type) for a result filename, or (None, None) if it is not recognised"""
+    for suffix, job_type in OUTPUT_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)], job_type
+    return None, None
+
+class FileCatalog:
+    """SQLite index of uploaded and generated files, so listings never scan the folders"""
+
+    def __init__(self, db_path, logger):
+        self.db_path = db_path
+        self.logger = logger
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(files)")]
+            if 'disk_bytes' not in columns:
+                conn.execute("ALTER TABLE files ADD COLUMN disk_bytes INTEGER")
+                rows = conn.execute("SELECT folder, filename, path FROM files").fetchall()
+                for row in rows:
+                    if os.path.exists(row['path']):
+                        size, disk_bytes = self._file_sizes(row['path'])
+                        conn.execute(
+                            "UPDATE files SET size = ?, disk_bytes = ? WHERE folder = ? AND filename = ?",
+                            (size, disk_bytes, row['folder'], row['filename'])
+                        )
+
+    @staticmethod
+    def _file_sizes(path):
+        """Size of the file itself, and the bytes it occupies on disk including compressed copies"""
+        size = os.path.getsize(path)
+        disk_bytes = size + sum(
+            os.path.getsize(compressed_path(path, encoding)) for encoding in available_encodings(path)
+        )
+        return size, disk_bytes
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add_file(self, folder, path, file_id=None, job_type=None, original_filename=None):
+        """Record a file that has just been written to disk"""
+        stat = os.stat(path)
+        # Compressed copies are stored and evicted together with the file, so count them for retention
+        size, disk_bytes = self._file_sizes(path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(folder, filename, path, file_id, job_type, original_filename, size, disk_bytes, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (folder, os.path.basename(path), path, file_id, job_type,
+                 original_filename, size, disk_bytes, stat.st_mtime)
+            )
+
+    def sync_folder(self, folder, directory, extensions=None):
+        """Reconcile the catalog with the files on disk: add new files and drop missing ones"""
+        with self._connect() as conn:
+            known = {row['filename']: row['path'] for row in conn.execute(
+                "SELECT filename, path FROM files WHERE folder = ?", (folder,)
+            )}
+
+        on_disk = set()
+        added = 0
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            if extensions and not entry.name.endswith(extensions):
+                continue
+            on_disk.add(entry.name)
+            if entry.name not in known:
+                file_id, job_type = infer_job(entry.name)
+                self.add_file(folder, entry.path, file_id, job_type)
+                added += 1
+
+        missing = [path for filename, path in known.items() if filename not in on_disk]
+        self._forget(folder, missing)
+
+        if added or missing:
+            self.logger.info(f"Catalog sync for {directory}: {added} added, {len(missing)} missing removed")
+        return added
+
+    def _forget(self, folder, paths):
+        """Drop rows for files that are gone from disk, along with any compressed copies left behind"""
+        if not paths:
+            return
+        for path in paths:
+            for encoding in available_encodings(path):
+                try:
+                    os.remove(compressed_path(path, encoding))
+                except OSError as e:
+                    self.logger.error(f"Error removing compressed copy of {path}: {e}")
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM files WHERE folder = ? AND filename = ?",
+                [(folder, os.path.basename(path)) for path in paths]
+            )
+
+    def get_file(self, folder, filename):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT * FROM files WHERE folder = ? AND filename = ?", (folder, filename)
+            ).fetchone()
+
+    def list_files(self, folder, job_type=None, search=None, page=1, per_page=50):
+        """Return one page of files (newest first) and the total number of matches"""
+        where = "folder = ?"
+        params = [folder]
+        if job_type:
+            where += " AND job_type = ?"
+            params.append(job_type)
+        if search:
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            where += " AND (filename LIKE ? ESCAPE '\\' OR original_filename LIKE ? ESCAPE '\\')"
+            params.extend([pattern, pattern])
+
+        while True:
+            with self._connect() as conn:
+                total = conn.execute(f"SELECT COUNT(*) FROM files WHERE {where}", params).fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT * FROM files WHERE {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                    params + [per_page, (page - 1) * per_page]
+                ).fetchall()
+
+            # Files deleted outside the app are dropped the first time they would be listed
+            missing = [row['path'] for row in rows if not os.path.exists(row['path'])]
+            if not missing:
+                break
+            self._forget(folder, missing)
+
+        files = [{
+            'filename': row['filename'],
+            'original_filename': row['original_filename'],
+            'job_type': row['job_type'],
+            'size': row['size'],
+            'modified': datetime.fromtimestamp(row['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+        } for row in rows]
+        return files, total
+
+    def _remove(self, conn, rows):
+        for row in rows:
+            paths = [row['path']] + [
+                compressed_path(row['path'], encoding) for encoding in available_encodings(row['path'])
+            ]
+            try:
+                for path in paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+            except OSError as e:
+                self.logger.error(f"Error evicting file {row['path']}: {e}")
+                continue
+            conn.execute(
+                "DELETE FROM files WHERE folder = ? AND filename = ?", (row['folder'], row['filename'])
+            )
+        return len(rows)
+
+    def evict(self, folder, max_age_days=None, max_bytes=None):
+        """Delete files older than max_age_days, then the oldest files until under max_bytes"""
+        removed = 0
+        with self._connect() as conn:
+            if max_age_days:
+                cutoff = time.time() - max_age_days * 86400
+                rows = conn.execute(
+                    "SELECT * FROM files WHERE folder = ? AND created_at < ?", (folder, cutoff)
+                ).fetchall()
+                removed += self._remove(conn, rows)
+
+            if max_bytes:
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(COALESCE(disk_bytes, size)), 0) FROM files WHERE folder = ?", (folder,)
+                ).fetchone()[0]
+                if total > max_bytes:
+                    rows = []
+                    for row in conn.execute(
+                        "SELECT * FROM files WHERE folder = ? ORDER BY created_at", (folder,)
+                    ):
+                        if total <= max_bytes:
+                            break
+                        rows.append(row)
+                        total -= row['disk_bytes'] if row['disk_bytes'] is not None else row['size']
+                    removed += self._remove(conn, rows)
+
+        if removed:
+            self.logger.info(f"Evicted {removed} files from {folder}")
+        return removed
@@ -0,0 +1,43 @@
+import gzip
+import os
+import shutil
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressed copies are stored next to the result file with these suffixes
+ENCODING_EXTENSIONS = {
+    'zstd': '.zst',
+    'gzip': '.gz',
+}
+
+def compressed_path(path, encoding):
+    return path + ENCODING_EXTENSIONS[encoding]
+
+def compress_file(path, encoding='gzip'):
+    """Write a compressed copy of a finished result file and return its path"""
+    if encoding not in ENCODING_EXTENSIONS:
+        raise ValueError(f"Unsupported compression: {encoding}")
+    if encoding == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+
+    target = compressed_path(path, encoding)
+    tmp_path = target + '.tmp'
+    with open(path, 'rb') as src:
+        if encoding == 'gzip':
+            with gzip.GzipFile(tmp_path, 'wb', compresslevel=6, mtime=0) as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            with open(tmp_path, 'wb') as dst:
+                zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+
+    # Rename into place so a partially written copy is never served
+    os.replace(tmp_path, target)
+    return target
+
+def available_encodings(path):
+    """Encodings that have a compressed copy of path on disk"""
+    return [encoding for encoding in ENCODING_EXTENSIONS
+            if os.path.exists(compressed_path(path, encoding))]
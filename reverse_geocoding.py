@@ -2,12 +2,14 @@ import pandas as pd
 import logging
 import sys
 import os
+import numpy as np
 from geopy.geocoders import Nominatim
 from geopy.extra.rate_limiter import RateLimiter
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from config import *
+from coordinate_parser import parse_coordinate_frame
 
 def setup_reverse_geocoding():
     """Set up reverse geocoding with rate limiting and retry logic"""
@@ -135,29 +137,30 @@ def process_reverse_geocoding_file(input_file, output_file, reverse_geocoder, lo
     output_df = pd.DataFrame(columns=output_columns)
     output_df.to_csv(output_file, index=False)
     
-    coords_list = []
-    for index, row in df.iterrows():
-        coord_str = str(row[0]).strip()
-        try:
-            lat_str, lon_str = coord_str.split(',')
-            coords_list.append({
-                'lat': float(lat_str.strip()),
-                'lon': float(lon_str.strip())
-            })
-        except (ValueError, IndexError):
-            logger.warning(f"Invalid coordinate format: {coord_str}")
-            coords_list.append({
-                'lat': None,
-                'lon': None
-            })
+    parsed = parse_coordinate_frame(df)
+    for i in np.flatnonzero(~parsed.valid):
+        logger.warning(f"Invalid coordinate format: {parsed.input_coordinates[i]}")
+    coords_list = [
+        {'lat': float(lat), 'lon': float(lon)} if valid else {'lat': None, 'lon': None}
+        for lat, lon, valid in zip(parsed.latitudes, parsed.longitudes, parsed.valid)
+    ]
     
+    # Repeated points are looked up once; rows keep the input order so each batch can be saved as it finishes
+    cache = {}
     for i in range(0, len(coords_list), BATCH_SIZE):
         batch = coords_list[i:i + BATCH_SIZE]
         logger.info(f"Processing reverse geocoding batch {i//BATCH_SIZE + 1}/{(len(coords_list)-1)//BATCH_SIZE + 1}")
         
         batch_results = []
         for coords in batch:
+            key = (coords['lat'], coords['lon'])
+            if key[0] is not None and key in cache:
+                batch_results.append(dict(cache[key]))
+                continue
             result = reverse_geocode_single(coords, reverse_geocoder, logger)
+            # Failed lookups (e.g. timeouts) are not cached so repeats of the point are retried
+            if key[0] is not None and result['error'] in (None, 'No location found'):
+                cache[key] = result
             batch_results.append(result)
         
         batch_df = pd.DataFrame(batch_results)
@@ -0,0 +1,76 @@
+import numpy as np
+from config import SPATIAL_GRID_ROWS, SPATIAL_GRID_COLS
+
+CURVE_BITS = 16
+
+def grid_cells(latitudes, longitudes, rows=SPATIAL_GRID_ROWS, cols=SPATIAL_GRID_COLS):
+    """Map coordinate arrays to (row, col) cell indices on the elevation grid"""
+    lats = np.asarray(latitudes, dtype=float)
+    lons = np.asarray(longitudes, dtype=float)
+
+    row = np.floor((lats + 90.0) / 180.0 * rows)
+    col = np.floor((lons + 180.0) / 360.0 * cols)
+
+    row = np.clip(np.nan_to_num(row), 0, rows - 1).astype(np.int64)
+    col = np.clip(np.nan_to_num(col), 0, cols - 1).astype(np.int64)
+    return row, col
+
+def _spread_bits(values):
+    """Insert a zero bit between each of the lower 32 bits of values"""
+    v = values.astype(np.uint64)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+def morton_keys(rows, cols):
+    """Z-order key for each (row, col) cell"""
+    return _spread_bits(rows) | (_spread_bits(cols) << np.uint64(1))
+
+def hilbert_keys(rows, cols, bits=CURVE_BITS):
+    """Hilbert curve distance for each (row, col) cell"""
+    n = 1 << bits
+    x = np.asarray(cols, dtype=np.int64).copy()
+    y = np.asarray(rows, dtype=np.int64).copy()
+    d = np.zeros_like(x)
+
+    s = n >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+
+        # Rotate the quadrant so the sub-curve has the right orientation
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ry == 0
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+
+    return d
+
+def spatial_order(latitudes, longitudes, curve='morton'):
+    """Return the permutation that visits points along a space-filling curve.
+
+    Points with missing coordinates are kept at the end in their original order.
+    """
+    lats = np.asarray(latitudes, dtype=float)
+    lons = np.asarray(longitudes, dtype=float)
+    rows, cols = grid_cells(lats, lons)
+
+    if curve == 'morton':
+        keys = morton_keys(rows, cols).astype(np.float64)
+    elif curve == 'hilbert':
+        keys = hilbert_keys(rows, cols).astype(np.float64)
+    else:
+        raise ValueError(f"Unknown space-filling curve: {curve}")
+
+    keys[np.isnan(lats) | np.isnan(lons)] = np.inf
+    return np.argsort(keys, kind='stable')
+
+def chunk_indices(indices, chunk_size):
+    """Split an index array into consecutive chunks of at most chunk_size"""
+    return [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]